@@ -1,9 +1,42 @@
 """Data fetching module using vnstock3 for Vietnamese stock market data."""
 
-from datetime import datetime
-from typing import List, Tuple
+import hashlib
+import math
+import os
+import re
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from datetime import date, datetime
+from pathlib import Path
+from typing import List, Optional, Tuple
+import numpy as np
 import pandas as pd
-from vnstock import Quote
+
+
+# Upper bound on concurrent vnstock requests
+MAX_FETCH_WORKERS = 8
+# Seconds allowed per round of MAX_FETCH_WORKERS concurrent fetches; the batch
+# deadline scales with the number of rounds, and tickers still outstanding
+# after it are reported as failed
+FETCH_TIMEOUT = 30
+
+# On-disk cache for price histories (override location with TPO_CACHE_DIR)
+CACHE_DIR = Path(os.environ.get("TPO_CACHE_DIR", Path.home() / ".cache" / "tpo"))
+# Windows that include today can still change; anything older is immutable
+CACHE_TTL_SECONDS = 24 * 60 * 60
+
+# Pool size for the shared HTTP session (>= MAX_FETCH_WORKERS so threads never wait)
+HTTP_POOL_SIZE = 16
+
+_session_lock = threading.Lock()
+_session_installed = False
+
+# A VN ticker is 3+ alphanumeric characters, optionally surrounded by whitespace
+_TICKER_RE = re.compile(r'^\s*([A-Za-z0-9]{3,})\s*$')
 
 
 class DataFetchError(Exception):
@@ -11,6 +44,21 @@ class DataFetchError(Exception):
     pass
 
 
+def parse_tickers(tickers_input: str) -> List[str]:
+    """
+    Split a comma-separated ticker string into upper-cased, stripped symbols.
+
+    Args:
+        tickers_input: Raw user input, e.g. "fpt, VNM,vic"
+
+    Returns:
+        List of ticker symbols with empty and repeated entries removed (first
+        occurrence kept)
+    """
+    tickers = [t.strip().upper() for t in tickers_input.split(",") if t and not t.isspace()]
+    return list(dict.fromkeys(tickers))
+
+
 def validate_tickers(tickers: List[str]) -> Tuple[List[str], List[str]]:
     """
     Validate Vietnamese stock tickers.
@@ -25,15 +73,149 @@ def validate_tickers(tickers: List[str]) -> Tuple[List[str], List[str]]:
     invalid = []
 
     for ticker in tickers:
-        ticker = ticker.strip().upper()
-        if ticker and len(ticker) >= 3:  # Basic validation for VN tickers
-            valid.append(ticker)
+        match = _TICKER_RE.match(ticker)
+        if match:
+            valid.append(match.group(1).upper())
         else:
-            invalid.append(ticker)
+            invalid.append(ticker.strip().upper())
 
     return valid, invalid
 
 
+def _install_shared_session() -> None:
+    """
+    Route vnstock's HTTP calls through one pooled, keep-alive requests.Session.
+
+    vnstock's Quote issues module-level requests.get/post calls with no session
+    hook, so each ticker pays a fresh TCP+TLS handshake. Swapping the `requests`
+    name inside vnstock's client module for a session-backed namespace lets the
+    concurrent fetches reuse connections. If vnstock's internals differ from what
+    we expect, it is left untouched.
+    """
+    global _session_installed
+
+    with _session_lock:
+        if _session_installed:
+            return
+        _session_installed = True
+
+        try:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+            from vnstock.core.utils import client
+        except ImportError:
+            return
+
+        if getattr(client, "requests", None) is not requests:
+            return
+
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=HTTP_POOL_SIZE,
+            pool_maxsize=HTTP_POOL_SIZE,
+            max_retries=Retry(total=3, backoff_factor=0.3)
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+
+        client.requests = SimpleNamespace(
+            get=session.get,
+            post=session.post,
+            exceptions=requests.exceptions
+        )
+
+
+def _cache_path(ticker: str, start_date: str, end_date: str) -> Path:
+    """Return the cache file path for a (ticker, start, end) window."""
+    cache_key = hashlib.md5(f"{ticker}|{start_date}|{end_date}".encode()).hexdigest()
+    return CACHE_DIR / f"{cache_key}.pkl"
+
+
+def _read_cache(path: Path, end_date: str) -> Optional[pd.Series]:
+    """
+    Load a cached close series if present and still fresh.
+
+    An entry written after its window closed (mtime date later than end_date) holds
+    the complete history and never expires. Anything written while the window was
+    still open may be partial, so it expires after CACHE_TTL_SECONDS.
+    """
+    try:
+        mtime = path.stat().st_mtime
+        written_on = date.fromtimestamp(mtime).isoformat()
+        if written_on <= end_date and time.time() - mtime > CACHE_TTL_SECONDS:
+            return None
+        return pd.read_pickle(path)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"Warning: Ignoring unreadable cache file {path}: {str(e)}")
+        return None
+
+
+def _write_cache(path: Path, series: pd.Series) -> None:
+    """Store a close series in the cache. Failures are non-fatal."""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a uniquely named temp file first so concurrent readers never
+        # see partial data and concurrent writers (threads or processes) never share one
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=path.stem, suffix='.tmp')
+        os.close(fd)
+        try:
+            series.to_pickle(tmp_name)
+            os.replace(tmp_name, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+            raise
+    except OSError as e:
+        print(f"Warning: Could not write cache file {path}: {str(e)}")
+
+
+def _fetch_one(
+    ticker: str,
+    start_date: str,
+    end_date: str
+) -> Tuple[str, Optional[pd.Series]]:
+    """
+    Fetch the closing price history for a single ticker.
+
+    Args:
+        ticker: Vietnamese stock ticker symbol
+        start_date: Start date in YYYY-MM-DD format
+        end_date: End date in YYYY-MM-DD format
+
+    Returns:
+        Tuple of (ticker, close_series), where close_series is None if no data
+    """
+    cache_path = _cache_path(ticker, start_date, end_date)
+    cached = _read_cache(cache_path, end_date)
+    if cached is not None:
+        return ticker, cached
+
+    # Imported lazily: vnstock is slow to import and only needed on a cache miss
+    from vnstock import Quote
+    _install_shared_session()
+
+    # Fetch historical data using Quote directly
+    quote = Quote(symbol=ticker, source='VCI')
+    df = quote.history(
+        start=start_date,
+        end=end_date,
+        interval='1D'
+    )
+
+    if df is None or df.empty or 'close' not in df.columns:
+        return ticker, None
+
+    # Set time as index and use close price
+    series = df.set_index('time')['close']
+    _write_cache(cache_path, series)
+    return ticker, series
+
+
 def fetch_vn_stock_data(
     tickers: List[str],
     start_date: str,
@@ -69,30 +251,56 @@ def fetch_vn_stock_data(
     if not valid_tickers:
         raise DataFetchError("No valid tickers provided")
 
-    # Fetch data for each ticker
+    # Fetch and return each ticker once, in the order first entered
+    valid_tickers = list(dict.fromkeys(valid_tickers))
+
+    # Fetch data for all tickers concurrently (network-bound, so threads overlap I/O)
     price_data = {}
     failed_tickers = []
 
-    for ticker in valid_tickers:
-        try:
-            # Fetch historical data using Quote directly
-            quote = Quote(symbol=ticker, source='VCI')
-            df = quote.history(
-                start=start_date,
-                end=end_date,
-                interval='1D'
-            )
-
-            if df is not None and not df.empty and 'close' in df.columns:
-                # Set time as index and use close price
-                df = df.set_index('time')
-                price_data[ticker] = df['close']
-            else:
-                failed_tickers.append(ticker)
+    workers = min(MAX_FETCH_WORKERS, len(valid_tickers))
+    # Queued fetches only start once a worker frees up, so allow one timeout per round
+    batch_timeout = FETCH_TIMEOUT * math.ceil(len(valid_tickers) / workers)
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    futures = {
+        executor.submit(_fetch_one, ticker, start_date, end_date): ticker
+        for ticker in valid_tickers
+    }
 
+    def collect(future) -> None:
+        """Record a finished fetch in price_data or failed_tickers."""
+        ticker = futures[future]
+        try:
+            _, series = future.result()
         except Exception as e:
             failed_tickers.append(ticker)
             print(f"Warning: Failed to fetch data for {ticker}: {str(e)}")
+            return
+
+        if series is not None:
+            price_data[ticker] = series
+        else:
+            failed_tickers.append(ticker)
+
+    pending = set(futures)
+    try:
+        for future in as_completed(futures, timeout=batch_timeout):
+            pending.discard(future)
+            collect(future)
+    except FuturesTimeoutError:
+        for future in futures:
+            if future not in pending:
+                continue
+            # A fetch may have finished just after the deadline; keep its result
+            if future.done():
+                collect(future)
+            else:
+                failed_tickers.append(futures[future])
+                print(f"Warning: Timed out fetching data for {futures[future]}")
+    finally:
+        # Don't block on stragglers that already timed out
+        executor.shutdown(wait=False, cancel_futures=True)
 
     if not price_data:
         raise DataFetchError(
@@ -102,11 +310,14 @@ def fetch_vn_stock_data(
     if failed_tickers:
         print(f"Warning: Could not fetch data for: {', '.join(failed_tickers)}")
 
-    # Combine into single DataFrame
-    prices_df = pd.DataFrame(price_data)
-
-    # Drop rows with any NaN values
-    prices_df = prices_df.dropna()
+    # Combine into single DataFrame, keeping only dates every ticker has a price for.
+    # Columns follow the order the user entered the tickers in.
+    series_list = [
+        price_data[ticker].dropna().rename(ticker)
+        for ticker in valid_tickers
+        if ticker in price_data
+    ]
+    prices_df = pd.concat(series_list, axis=1, join='inner')
 
     if prices_df.empty:
         raise DataFetchError("No valid price data available after cleaning")
@@ -116,4 +327,6 @@ def fetch_vn_stock_data(
             f"Insufficient data points ({len(prices_df)}). Need at least 30 days of data."
         )
 
-    return prices_df
+    # float32 is ample precision for prices and halves the size of the price frame
+    # and its pct_change(); pypfopt still returns float64 mu and covariance
+    return prices_df.astype(np.float32)
@@ -1,8 +1,10 @@
 """Main Textual TUI application for Terminal Portfolio Optimizer."""
 
+import subprocess
 import sys
 from datetime import datetime, timedelta
 from pathlib import Path
+import numpy as np
 from textual.app import App, ComposeResult
 from textual.containers import Container, Vertical, Horizontal
 from textual.widgets import Header, Footer, Input, Button, Static, Label
@@ -10,19 +12,11 @@ from textual.screen import Screen
 from textual import on, work
 from textual.worker import get_current_worker
 
-from src.data_fetcher import fetch_vn_stock_data, DataFetchError
-from src.optimizer import (
-    calculate_efficient_frontier,
-    get_max_sharpe_allocation,
-    get_min_volatility_allocation,
-    get_max_utility_allocation,
-    generate_random_portfolios,
-    get_portfolio_performance,
-    OptimizationError,
-    expected_returns,
-    risk_models
-)
-from src.visualizer import create_enhanced_portfolio_chart, display_charts
+from src.data_fetcher import fetch_vn_stock_data, parse_tickers, DataFetchError
+
+# src.optimizer (pypfopt/cvxpy) and src.visualizer (plotly) are slow to import,
+# so they are loaded off the main thread: preloaded after mount and imported
+# again (a no-op by then) inside the optimization worker.
 
 
 class InputScreen(Screen):
@@ -118,7 +112,7 @@ class InputScreen(Screen):
             return
 
         # Parse tickers
-        tickers = [t.strip().upper() for t in tickers_input.split(",") if t.strip()]
+        tickers = parse_tickers(tickers_input)
 
         if not tickers:
             self.query_one("#error-message", Static).update("Error: No valid tickers found")
@@ -147,56 +141,79 @@ class InputScreen(Screen):
         2. Running optimization calculations
         3. Displaying charts in separate PyWebView process
         """
+        from src.optimizer import (
+            calculate_efficient_frontier,
+            get_max_sharpe_allocation,
+            get_min_volatility_allocation,
+            get_max_utility_allocation,
+            generate_random_portfolios,
+            get_portfolio_performance,
+            get_expected_returns_and_cov,
+            OptimizationError
+        )
+        from src.visualizer import create_enhanced_portfolio_chart, display_charts
+
         try:
             # Fetch data
             prices = fetch_vn_stock_data(tickers, start_date, end_date)
 
-            # Calculate expected returns and covariance (needed for random portfolios)
-            mu = expected_returns.mean_historical_return(prices)
-            S = risk_models.sample_cov(prices)
+            # Tickers that failed or timed out are dropped from the optimization
+            missing = [ticker for ticker in tickers if ticker not in prices.columns]
+            if missing:
+                self.app.call_from_thread(
+                    self.query_one("#error-message", Static).update,
+                    f"Warning: Could not fetch data for {', '.join(missing)}; "
+                    "optimizing the remaining tickers"
+                )
+
+            # Calculate expected returns and covariance once and reuse them everywhere
+            # (cached across runs that only change the risk-free rate or risk aversion)
+            mu, S = get_expected_returns_and_cov(prices)
 
             # Calculate efficient frontier
             ef_returns, ef_volatilities, _ = calculate_efficient_frontier(
-                prices, risk_free_rate
+                prices, risk_free_rate, mu=mu, S=S
             )
 
             # Get max Sharpe portfolio
-            max_sharpe_weights = get_max_sharpe_allocation(prices, risk_free_rate)
-            max_sharpe_metrics = get_portfolio_performance(prices, max_sharpe_weights, risk_free_rate)
-            max_sharpe_data = {
-                'weights': max_sharpe_weights,
-                'return': max_sharpe_metrics[0],
-                'volatility': max_sharpe_metrics[1],
-                'sharpe': max_sharpe_metrics[2]
-            }
+            max_sharpe_weights = get_max_sharpe_allocation(prices, risk_free_rate, mu=mu, S=S)
+            max_sharpe_metrics = get_portfolio_performance(
+                prices, max_sharpe_weights, risk_free_rate, mu=mu, S=S
+            )
 
             # Get min volatility portfolio
-            min_vol_weights = get_min_volatility_allocation(prices, risk_free_rate)
-            min_vol_metrics = get_portfolio_performance(prices, min_vol_weights, risk_free_rate)
-            min_vol_data = {
-                'weights': min_vol_weights,
-                'return': min_vol_metrics[0],
-                'volatility': min_vol_metrics[1],
-                'sharpe': min_vol_metrics[2]
-            }
+            min_vol_weights = get_min_volatility_allocation(prices, risk_free_rate, mu=mu, S=S)
+            min_vol_metrics = get_portfolio_performance(
+                prices, min_vol_weights, risk_free_rate, mu=mu, S=S
+            )
 
             # Get max utility portfolio
-            max_utility_weights = get_max_utility_allocation(prices, risk_aversion, risk_free_rate)
-            max_utility_metrics = get_portfolio_performance(prices, max_utility_weights, risk_free_rate)
-            max_utility_data = {
-                'weights': max_utility_weights,
-                'return': max_utility_metrics[0],
-                'volatility': max_utility_metrics[1],
-                'sharpe': max_utility_metrics[2]
-            }
+            max_utility_weights = get_max_utility_allocation(
+                prices, risk_aversion, risk_free_rate, mu=mu, S=S
+            )
+            max_utility_metrics = get_portfolio_performance(
+                prices, max_utility_weights, risk_free_rate, mu=mu, S=S
+            )
+
+            # Performance of the three portfolios as one record array (Max Sharpe,
+            # Min Volatility, Max Utility) plus their weights in the same order
+            opt_portfolios = np.rec.fromrecords(
+                [max_sharpe_metrics, min_vol_metrics, max_utility_metrics],
+                names='ret,vol,sharpe'
+            )
+            opt_weights = [
+                w.to_dict() for w in (max_sharpe_weights, min_vol_weights, max_utility_weights)
+            ]
 
             # Generate random portfolios
-            random_portfolios = generate_random_portfolios(mu, S, n_samples=1000)
+            random_portfolios = generate_random_portfolios(
+                mu, S, n_samples=1000, risk_free_rate=risk_free_rate
+            )
 
             # Create enhanced visualization
             html_content = create_enhanced_portfolio_chart(
                 ef_returns, ef_volatilities,
-                max_sharpe_data, min_vol_data, max_utility_data,
+                opt_portfolios, opt_weights,
                 random_portfolios,
                 risk_aversion
             )
@@ -207,9 +224,19 @@ class InputScreen(Screen):
                 "Optimization complete! Opening visualization..."
             )
 
-            # Display charts in separate process (this will block until window is closed)
-            # But since we're in a worker thread, the Textual UI remains responsive
-            display_charts(html_content)
+            # Display charts in separate process; display_charts returns immediately
+            process = display_charts(html_content)
+
+            # Wait for the window to close, but give up if a newer optimization
+            # has replaced this (exclusive) worker in the meantime
+            worker = get_current_worker()
+            while True:
+                try:
+                    process.wait(timeout=0.25)
+                    break
+                except subprocess.TimeoutExpired:
+                    if worker.is_cancelled:
+                        return
 
             # Clear success message after window closes
             self.app.call_from_thread(
@@ -252,6 +279,16 @@ class PortfolioApp(App):
     def on_mount(self) -> None:
         """Mount the input screen."""
         self.push_screen(InputScreen())
+        self.preload_modules()
+
+    @work(thread=True)
+    def preload_modules(self) -> None:
+        """Import the heavy optimization and charting modules in the background."""
+        import src.optimizer
+        import src.visualizer
+        # src.visualizer imports plotly lazily; warm it here so the first chart is fast
+        import plotly.graph_objects
+        import plotly.subplots
 
     def action_quit(self) -> None:
         """Quit the application."""
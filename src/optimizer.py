@@ -1,10 +1,40 @@
 """Portfolio optimization module using PyPortfolioOpt."""
 
-from typing import Dict, Tuple
+import math
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple, Union
 import pandas as pd
 import numpy as np
+from scipy.linalg import cho_factor, cho_solve
 from pypfopt import EfficientFrontier, risk_models, expected_returns
-from pypfopt.exceptions import OptimizationError
+from pypfopt import exceptions as pypfopt_exceptions
+
+try:
+    from numba import config as numba_config, njit, prange
+except ImportError:  # numba is optional; the NumPy path is used without it
+    njit = None
+else:
+    # The kernel is launched from Textual worker threads, after which the TBB
+    # layer keeps the process from exiting, so prefer OpenMP. workqueue is the
+    # fallback; it is not threadsafe, which _numba_lock below accounts for.
+    numba_config.THREADING_LAYER_PRIORITY = ["omp", "workqueue", "tbb"]
+
+
+# Weights at or below this are treated as zero
+MIN_WEIGHT = 0.0001
+
+# Number of (mu, S) pairs kept by get_expected_returns_and_cov
+MU_COV_CACHE_SIZE = 8
+
+_mu_cov_cache: "OrderedDict[tuple, Tuple[pd.Series, pd.DataFrame]]" = OrderedDict()
+_mu_cov_lock = threading.Lock()
+
+# Serializes launches of the parallel Numba kernel. A cancelled Textual worker
+# keeps running alongside its replacement, so two launches can overlap, and
+# the workqueue threading layer aborts the process on concurrent use.
+_numba_lock = threading.Lock()
 
 
 class OptimizationError(Exception):
@@ -12,10 +42,132 @@ class OptimizationError(Exception):
     pass
 
 
+@dataclass
+class Allocation:
+    """Portfolio allocation stored as parallel ticker/weight arrays, largest weight first."""
+
+    tickers: np.ndarray
+    weights: np.ndarray
+
+    @classmethod
+    def from_weights(cls, weights: Dict[str, float]) -> "Allocation":
+        """Build an allocation from a {ticker: weight} dict, dropping near-zero weights."""
+        tickers = np.array(list(weights.keys()), dtype=object)
+        values = np.fromiter(weights.values(), dtype=np.float64, count=len(weights))
+        keep = np.flatnonzero(values > MIN_WEIGHT)
+        # Sort once here so charts can use the weights in order as they are
+        keep = keep[np.argsort(-values[keep], kind='stable')]
+        return cls(tickers[keep], values[keep])
+
+    def to_dict(self) -> Dict[str, float]:
+        """Return the allocation as a {ticker: weight} dict, largest weight first."""
+        return dict(zip(self.tickers.tolist(), self.weights.tolist()))
+
+
+def _expected_returns_and_cov(
+    prices: pd.DataFrame,
+    mu: Optional[pd.Series] = None,
+    S: Optional[pd.DataFrame] = None
+) -> Tuple[pd.Series, pd.DataFrame]:
+    """Return (mu, S), computing whichever of them was not supplied."""
+    if mu is None:
+        mu = expected_returns.mean_historical_return(prices)
+    if S is None:
+        S = risk_models.sample_cov(prices)
+    return mu, S
+
+
+def get_expected_returns_and_cov(prices: pd.DataFrame) -> Tuple[pd.Series, pd.DataFrame]:
+    """
+    Return (mu, S) for a price frame, reusing results for identical inputs.
+
+    Re-running with only a different risk-free rate or risk aversion leaves mu and S
+    unchanged, so they are kept in a small process-local LRU cache keyed by the
+    tickers, date range, row count and latest prices. The returned objects are
+    shared and must not be mutated.
+
+    Args:
+        prices: DataFrame of historical prices (tickers as columns)
+
+    Returns:
+        Tuple of (expected_returns, covariance_matrix)
+    """
+    key = (
+        tuple(prices.columns),
+        str(prices.index[0]),
+        str(prices.index[-1]),
+        len(prices),
+        tuple(prices.iloc[-1].tolist())
+    )
+
+    with _mu_cov_lock:
+        if key in _mu_cov_cache:
+            _mu_cov_cache.move_to_end(key)
+            return _mu_cov_cache[key]
+
+    mu, S = _expected_returns_and_cov(prices)
+
+    with _mu_cov_lock:
+        _mu_cov_cache[key] = (mu, S)
+        _mu_cov_cache.move_to_end(key)
+        while len(_mu_cov_cache) > MU_COV_CACHE_SIZE:
+            _mu_cov_cache.popitem(last=False)
+
+    return mu, S
+
+
+def _analytic_frontier_weights(
+    mu: np.ndarray,
+    S: np.ndarray,
+    target_returns: np.ndarray
+) -> Optional[np.ndarray]:
+    """
+    Closed-form minimum-variance weights for each target return.
+
+    By the two-fund theorem the fully-invested frontier portfolio for target r is
+    w(r) = alpha(r)·S⁻¹1 + beta(r)·S⁻¹mu, with (alpha, beta) fixed by w·1 = 1 and
+    w·mu = r. No long-only constraint is applied; callers must check for negative
+    weights. Rows below the global minimum variance return are set to NaN, since
+    those points lie on the inefficient half of the hyperbola.
+
+    Args:
+        mu: Expected returns, shape (n_assets,)
+        S: Covariance matrix, shape (n_assets, n_assets)
+        target_returns: Target returns, shape (n_points,)
+
+    Returns:
+        Weights of shape (n_points, n_assets), or None if S is not positive definite
+        or mu offers no spread of returns
+    """
+    ones = np.ones(len(mu))
+    try:
+        factor = cho_factor(S)
+    except np.linalg.LinAlgError:
+        return None
+
+    # S⁻¹1 and S⁻¹mu from a single Cholesky factorisation
+    inv_ones, inv_mu = cho_solve(factor, np.column_stack([ones, mu])).T
+
+    a = ones @ inv_ones
+    b = ones @ inv_mu
+    c = mu @ inv_mu
+    d = a * c - b * b
+    if d <= 1e-12 * a * c:
+        return None
+
+    alpha = (c - target_returns * b) / d
+    beta = (target_returns * a - b) / d
+    weights = alpha[:, None] * inv_ones + beta[:, None] * inv_mu
+    weights[target_returns < b / a] = np.nan
+    return weights
+
+
 def calculate_efficient_frontier(
     prices: pd.DataFrame,
     risk_free_rate: float = 0.03,
-    num_points: int = 100
+    num_points: int = 100,
+    mu: Optional[pd.Series] = None,
+    S: Optional[pd.DataFrame] = None
 ) -> Tuple[np.ndarray, np.ndarray, Tuple[float, float]]:
     """
     Calculate the efficient frontier.
@@ -24,92 +176,102 @@ def calculate_efficient_frontier(
         prices: DataFrame of historical prices (tickers as columns)
         risk_free_rate: Annual risk-free rate (default 3%)
         num_points: Number of points to calculate on the frontier
+        mu: Precomputed expected returns (computed from prices if None)
+        S: Precomputed covariance matrix (computed from prices if None)
 
     Returns:
         Tuple of (returns_array, volatilities_array, (max_sharpe_return, max_sharpe_vol))
     """
     # Calculate expected returns and covariance matrix
-    mu = expected_returns.mean_historical_return(prices)
-    S = risk_models.sample_cov(prices)
+    mu, S = _expected_returns_and_cov(prices, mu, S)
 
-    returns_range = []
-    volatilities_range = []
+    mu_arr = np.asarray(mu, dtype=np.float64)
+    S_arr = np.asarray(S, dtype=np.float64)
 
-    # Get the min and max possible returns
-    ef_temp = EfficientFrontier(mu, S)
+    # Get the min and max possible returns in closed form: the global minimum
+    # variance portfolio is S⁻¹1 / (1ᵀS⁻¹1), and no long-only portfolio beats mu.max()
+    max_ret = float(mu_arr.max())
     try:
-        ef_temp.min_volatility()
-        min_ret = ef_temp.portfolio_performance()[0]
-    except:
-        min_ret = mu.min()
-
-    ef_temp = EfficientFrontier(mu, S)
-    try:
-        ef_temp.max_sharpe(risk_free_rate=risk_free_rate)
-        max_ret = ef_temp.portfolio_performance()[0]
-    except:
-        max_ret = mu.max()
+        w_mv = np.linalg.solve(S_arr, np.ones(len(mu_arr)))
+        w_mv /= w_mv.sum()
+        min_ret = float(np.clip(mu_arr @ w_mv, mu_arr.min(), max_ret))
+    except np.linalg.LinAlgError:
+        min_ret = float(mu_arr.min())
 
     # Calculate frontier points
-    target_returns = np.linspace(min_ret, max_ret * 1.2, num_points)
-
-    for target_return in target_returns:
+    target_returns = np.linspace(min_ret, max_ret, num_points)
+    returns_range = np.full(num_points, np.nan)
+    volatilities_range = np.full(num_points, np.nan)
+
+    # Solve the whole sweep in closed form; wherever those weights are long-only
+    # they are also the solution of the constrained problem
+    weights = _analytic_frontier_weights(mu_arr, S_arr, target_returns)
+    if weights is None:
+        analytic = np.zeros(num_points, dtype=bool)
+    else:
+        analytic = (weights >= -1e-10).all(axis=1)
+        w = weights[analytic]
+        returns_range[analytic] = w @ mu_arr
+        volatilities_range[analytic] = np.sqrt(np.einsum('ki,ij,kj->k', w, S_arr, w))
+
+    # Fall back to the solver only where the long-only constraint binds
+    for i in np.flatnonzero(~analytic):
         try:
             ef_temp = EfficientFrontier(mu, S)
-            ef_temp.efficient_return(target_return)
-            ret, vol, _ = ef_temp.portfolio_performance()
-            returns_range.append(ret)
-            volatilities_range.append(vol)
-        except (OptimizationError, ValueError):
+            ef_temp.efficient_return(target_returns[i])
+            returns_range[i], volatilities_range[i], _ = ef_temp.portfolio_performance()
+        except (pypfopt_exceptions.OptimizationError, ValueError):
             # Skip if optimization fails for this point
             continue
 
+    solved = ~np.isnan(returns_range)
+    returns_range = returns_range[solved]
+    volatilities_range = volatilities_range[solved]
+
     # Calculate max Sharpe portfolio
     ef_max = EfficientFrontier(mu, S)
     ef_max.max_sharpe(risk_free_rate=risk_free_rate)
     max_sharpe_return, max_sharpe_vol, _ = ef_max.portfolio_performance()
 
     return (
-        np.array(returns_range),
-        np.array(volatilities_range),
+        returns_range,
+        volatilities_range,
         (max_sharpe_return, max_sharpe_vol)
     )
 
 
 def get_max_sharpe_allocation(
     prices: pd.DataFrame,
-    risk_free_rate: float = 0.03
-) -> Dict[str, float]:
+    risk_free_rate: float = 0.03,
+    mu: Optional[pd.Series] = None,
+    S: Optional[pd.DataFrame] = None
+) -> Allocation:
     """
     Calculate the maximum Sharpe ratio portfolio allocation.
 
     Args:
         prices: DataFrame of historical prices (tickers as columns)
         risk_free_rate: Annual risk-free rate (default 3%)
+        mu: Precomputed expected returns (computed from prices if None)
+        S: Precomputed covariance matrix (computed from prices if None)
 
     Returns:
-        Dictionary of {ticker: weight} for the optimal portfolio
+        Allocation of tickers and weights for the optimal portfolio
 
     Raises:
         OptimizationError: If optimization fails
     """
     try:
         # Calculate expected returns and covariance matrix
-        mu = expected_returns.mean_historical_return(prices)
-        S = risk_models.sample_cov(prices)
+        mu, S = _expected_returns_and_cov(prices, mu, S)
 
         # Optimize for maximum Sharpe ratio
         ef = EfficientFrontier(mu, S)
         weights = ef.max_sharpe(risk_free_rate=risk_free_rate)
         cleaned_weights = ef.clean_weights()
 
-        # Get performance metrics
-        ret, vol, sharpe = ef.portfolio_performance(verbose=False)
-
         # Filter out zero weights
-        cleaned_weights = {k: v for k, v in cleaned_weights.items() if v > 0.0001}
-
-        return cleaned_weights
+        return Allocation.from_weights(cleaned_weights)
 
     except Exception as e:
         raise OptimizationError(f"Failed to optimize portfolio: {str(e)}")
@@ -117,25 +279,28 @@ def get_max_sharpe_allocation(
 
 def get_min_volatility_allocation(
     prices: pd.DataFrame,
-    risk_free_rate: float = 0.03
-) -> Dict[str, float]:
+    risk_free_rate: float = 0.03,
+    mu: Optional[pd.Series] = None,
+    S: Optional[pd.DataFrame] = None
+) -> Allocation:
     """
     Calculate the minimum volatility portfolio allocation.
 
     Args:
         prices: DataFrame of historical prices (tickers as columns)
         risk_free_rate: Annual risk-free rate (default 3%)
+        mu: Precomputed expected returns (computed from prices if None)
+        S: Precomputed covariance matrix (computed from prices if None)
 
     Returns:
-        Dictionary of {ticker: weight} for the minimum volatility portfolio
+        Allocation of tickers and weights for the minimum volatility portfolio
 
     Raises:
         OptimizationError: If optimization fails
     """
     try:
         # Calculate expected returns and covariance matrix
-        mu = expected_returns.mean_historical_return(prices)
-        S = risk_models.sample_cov(prices)
+        mu, S = _expected_returns_and_cov(prices, mu, S)
 
         # Optimize for minimum volatility
         ef = EfficientFrontier(mu, S)
@@ -143,9 +308,7 @@ def get_min_volatility_allocation(
         cleaned_weights = ef.clean_weights()
 
         # Filter out zero weights
-        cleaned_weights = {k: v for k, v in cleaned_weights.items() if v > 0.0001}
-
-        return cleaned_weights
+        return Allocation.from_weights(cleaned_weights)
 
     except Exception as e:
         raise OptimizationError(f"Failed to optimize portfolio: {str(e)}")
@@ -154,8 +317,10 @@ def get_min_volatility_allocation(
 def get_max_utility_allocation(
     prices: pd.DataFrame,
     risk_aversion: float = 1.0,
-    risk_free_rate: float = 0.03
-) -> Dict[str, float]:
+    risk_free_rate: float = 0.03,
+    mu: Optional[pd.Series] = None,
+    S: Optional[pd.DataFrame] = None
+) -> Allocation:
     """
     Calculate the maximum utility portfolio allocation.
 
@@ -163,17 +328,18 @@ def get_max_utility_allocation(
         prices: DataFrame of historical prices (tickers as columns)
         risk_aversion: Risk aversion parameter (default 1.0)
         risk_free_rate: Annual risk-free rate (default 3%)
+        mu: Precomputed expected returns (computed from prices if None)
+        S: Precomputed covariance matrix (computed from prices if None)
 
     Returns:
-        Dictionary of {ticker: weight} for the maximum utility portfolio
+        Allocation of tickers and weights for the maximum utility portfolio
 
     Raises:
         OptimizationError: If optimization fails
     """
     try:
         # Calculate expected returns and covariance matrix
-        mu = expected_returns.mean_historical_return(prices)
-        S = risk_models.sample_cov(prices)
+        mu, S = _expected_returns_and_cov(prices, mu, S)
 
         # Optimize for maximum quadratic utility
         ef = EfficientFrontier(mu, S)
@@ -181,72 +347,172 @@ def get_max_utility_allocation(
         cleaned_weights = ef.clean_weights()
 
         # Filter out zero weights
-        cleaned_weights = {k: v for k, v in cleaned_weights.items() if v > 0.0001}
-
-        return cleaned_weights
+        return Allocation.from_weights(cleaned_weights)
 
     except Exception as e:
         raise OptimizationError(f"Failed to optimize portfolio: {str(e)}")
 
 
+if njit is not None:
+    # cache=True persists the compiled kernel in __pycache__ across runs
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _rand_portfolios_numba(
+        mu: np.ndarray,
+        S: np.ndarray,
+        risk_free_rate: float,
+        n_samples: int
+    ) -> np.ndarray:
+        """
+        Sample Dirichlet(1, ..., 1) portfolios and score them in one fused pass.
+
+        Returns:
+            Array of shape (3, n_samples) holding returns, volatilities and Sharpe ratios
+        """
+        n_assets = mu.shape[0]
+        out = np.empty((3, n_samples))
+
+        for i in prange(n_samples):
+            # Normalised unit exponentials are Dirichlet(1, ..., 1) distributed
+            w = np.empty(n_assets)
+            total = 0.0
+            for j in range(n_assets):
+                w[j] = np.random.standard_exponential()
+                total += w[j]
+
+            ret = 0.0
+            var = 0.0
+            for j in range(n_assets):
+                w[j] /= total
+            for j in range(n_assets):
+                ret += w[j] * mu[j]
+                acc = 0.0
+                for k in range(n_assets):
+                    acc += S[j, k] * w[k]
+                var += w[j] * acc
+
+            vol = np.sqrt(var)
+            out[0, i] = ret
+            out[1, i] = vol
+            out[2, i] = (ret - risk_free_rate) / vol
+
+        return out
+
+    # Compile (or load from cache) at import so the first Optimize press doesn't pay for it
+    with _numba_lock:
+        _rand_portfolios_numba(np.zeros(2), np.eye(2), 0.0, 2)
+else:
+    _rand_portfolios_numba = None
+
+
 def generate_random_portfolios(
     mu: pd.Series,
     S: pd.DataFrame,
-    n_samples: int = 10000
+    n_samples: int = 10000,
+    risk_free_rate: float = 0.0,
+    seed: Optional[int] = None
 ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
     """
     Generate random portfolio samples for visualization.
 
+    Uses a parallel Numba kernel when numba is installed and no seed is given,
+    NumPy otherwise.
+
     Args:
         mu: Expected returns series
         S: Covariance matrix
         n_samples: Number of random portfolios to generate (default 10000)
+        risk_free_rate: Annual risk-free rate used for the Sharpe ratios (default 0)
+        seed: Seed for reproducible samples (default None)
 
     Returns:
         Tuple of (returns_array, volatilities_array, sharpe_ratios_array)
     """
+    # The parallel kernel's per-thread RNG streams aren't reproducible, so a
+    # seeded request always takes the NumPy path
+    if _rand_portfolios_numba is not None and seed is None:
+        # Copy into writable C-ordered float64 arrays to match the pre-compiled signature
+        mu_arr = np.array(mu, dtype=np.float64)
+        S_arr = np.array(S, dtype=np.float64, order='C')
+        with _numba_lock:
+            returns, volatilities, sharpe_ratios = _rand_portfolios_numba(
+                mu_arr, S_arr, float(risk_free_rate), n_samples
+            )
+        return returns, volatilities, sharpe_ratios
+
     n_assets = len(mu)
 
-    # Generate random weights using Dirichlet distribution
-    weights = np.random.dirichlet(np.ones(n_assets), n_samples)
+    # Generate random weights using Dirichlet distribution, shape (n_samples, n_assets),
+    # in a single draw from a Generator (faster than the legacy np.random API)
+    rng = np.random.default_rng(seed)
+    weights = rng.dirichlet(np.ones(n_assets), size=n_samples)
 
-    # Calculate returns
-    returns = weights.dot(mu)
+    # Calculate returns for all samples in one matrix-vector product
+    returns = weights @ np.asarray(mu)
 
-    # Calculate volatilities
-    volatilities = np.sqrt(np.diag(weights @ S @ weights.T))
+    # Calculate volatilities as the row-wise quadratic form w·S·w.
+    # (Avoids materialising the n_samples x n_samples matrix weights @ S @ weights.T)
+    volatilities = np.sqrt(((weights @ np.asarray(S)) * weights).sum(axis=1))
 
     # Calculate Sharpe ratios
-    sharpe_ratios = returns / volatilities
+    sharpe_ratios = (returns - risk_free_rate) / volatilities
 
     return returns, volatilities, sharpe_ratios
 
 
+def _perf(
+    mu: np.ndarray,
+    S: np.ndarray,
+    weights: np.ndarray,
+    risk_free_rate: float
+) -> Tuple[float, float, float]:
+    """Return (expected_return, volatility, sharpe_ratio) for aligned NumPy inputs."""
+    portfolio_return = float(mu @ weights)
+    portfolio_vol = math.sqrt(weights @ S @ weights)
+    sharpe = (portfolio_return - risk_free_rate) / portfolio_vol
+    return portfolio_return, portfolio_vol, sharpe
+
+
 def get_portfolio_performance(
     prices: pd.DataFrame,
-    weights: Dict[str, float],
-    risk_free_rate: float = 0.03
+    weights: Union[Allocation, Dict[str, float]],
+    risk_free_rate: float = 0.03,
+    mu: Optional[pd.Series] = None,
+    S: Optional[pd.DataFrame] = None
 ) -> Tuple[float, float, float]:
     """
     Calculate portfolio performance metrics.
 
     Args:
         prices: DataFrame of historical prices
-        weights: Dictionary of portfolio weights
+        weights: Allocation or dictionary of portfolio weights
         risk_free_rate: Annual risk-free rate
+        mu: Precomputed expected returns (computed from prices if None)
+        S: Precomputed covariance matrix (computed from prices if None)
 
     Returns:
         Tuple of (expected_return, volatility, sharpe_ratio)
     """
-    mu = expected_returns.mean_historical_return(prices)
-    S = risk_models.sample_cov(prices)
-
-    # Convert weights dict to the order of columns in prices
-    weights_array = np.array([weights.get(col, 0) for col in prices.columns])
-
-    # Calculate metrics
-    portfolio_return = np.dot(weights_array, mu)
-    portfolio_vol = np.sqrt(np.dot(weights_array, np.dot(S, weights_array)))
-    sharpe = (portfolio_return - risk_free_rate) / portfolio_vol
-
-    return portfolio_return, portfolio_vol, sharpe
+    mu, S = _expected_returns_and_cov(prices, mu, S)
+
+    # Scatter the weights into the order of assets in mu
+    if isinstance(weights, Allocation):
+        weights_array = np.zeros(len(mu))
+        positions = mu.index.get_indexer(weights.tickers)
+        # Like the dict path, ignore tickers that aren't in mu (-1 would wrap to the last asset)
+        known = positions >= 0
+        weights_array[positions[known]] = weights.weights[known]
+    else:
+        weights_array = np.fromiter(
+            (weights.get(col, 0.0) for col in mu.index),
+            dtype=np.float64,
+            count=len(mu)
+        )
+
+    # pypfopt already returns float64 mu/S (a no-op then); this only guards
+    # caller-supplied lower-precision inputs
+    return _perf(
+        np.asarray(mu, dtype=np.float64),
+        np.asarray(S, dtype=np.float64),
+        weights_array,
+        risk_free_rate
+    )
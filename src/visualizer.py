@@ -1,13 +1,363 @@
 """Visualization module using Plotly and PyWebView."""
 
-from typing import Dict
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Dict, List, Optional, Union, TYPE_CHECKING
+import base64
+import copy
 import sys
 import subprocess
-import base64
+import threading
+import json
+import os
+import tempfile
 from pathlib import Path
 import numpy as np
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+
+# plotly is imported inside the functions that use it, so importing this
+# module (e.g. only to call display_charts) stays cheap
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
+
+@lru_cache(maxsize=None)
+def _plotly_js_src() -> str:
+    """
+    Return the script URL for plotly.js.
+
+    plotly.js ships with the plotly package; load it from disk rather than the CDN.
+    The CDN copy of the same version is only used if the bundled file is missing.
+    """
+    import plotly
+    from plotly.offline import get_plotlyjs_version
+
+    path = Path(plotly.__file__).parent / "package_data" / "plotly.min.js"
+    if path.is_file():
+        return path.as_uri()
+    return f"https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js"
+
+
+# Long-lived webview process reused across display_charts calls, and the temp
+# HTML files handed to it (removed once its window closes)
+_viewer: Optional[subprocess.Popen] = None
+_viewer_files: List[str] = []
+_viewer_lock = threading.Lock()
+
+# The three optimal portfolios, in the order create_enhanced_portfolio_chart expects them
+OPTIMAL_PORTFOLIO_NAMES = ('Max Sharpe', 'Min Volatility', 'Max Utility')
+OPTIMAL_PORTFOLIO_COLORS = ('#ff433d', '#4af6c3', '#fb8b1e')
+
+# Number of discrete colours used for the random-portfolio Sharpe shading
+SHARPE_COLOR_BINS = 32
+
+HTML_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<script src="{plotly_js}"></script>
+<style>
+#legend {{ font: 12px sans-serif; color: #2a3f5f; margin: 8px 0 0 80px; }}
+#legend .swatch {{ display: inline-block; width: 12px; height: 12px; vertical-align: middle; }}
+#legend .value {{ margin: 0 6px; }}
+</style>
+</head>
+<body>
+<div id="legend">{legend_html}</div>
+<div id="chart"></div>
+<script type="application/json" id="figure-data">{figure_json}</script>
+<script>
+var revision = 0;
+function render(figure) {{
+    Plotly.react('chart', figure.data, figure.layout, figure.config || {{responsive: true}});
+}}
+function update(html) {{
+    var page = new DOMParser().parseFromString(html, 'text/html');
+    var figure = JSON.parse(page.getElementById('figure-data').textContent);
+    document.getElementById('legend').innerHTML = page.getElementById('legend').innerHTML;
+    // New data revision, same uirevision: Plotly redraws the traces but keeps zoom/pan
+    figure.layout.datarevision = ++revision;
+    render(figure);
+}}
+render(JSON.parse(document.getElementById('figure-data').textContent));
+</script>
+</body>
+</html>
+"""
+
+
+def _figure_to_html(fig: Union[go.Figure, dict], legend_html: str = '') -> str:
+    """
+    Render a figure as a minimal HTML page that draws it with Plotly.react.
+
+    The figure is serialized once with plotly.io.to_json (no re-validation) and
+    embedded as a JSON data block, instead of going through fig.to_html.
+    Template defaults for trace types the figure doesn't use are dropped so
+    they aren't shipped to the page.
+
+    Args:
+        fig: Plotly Figure object, or a plain {'data': [...], 'layout': {...}}
+            figure dict whose layout template may be given by name
+        legend_html: Static HTML shown above the chart (e.g. a colour legend)
+
+    Returns:
+        HTML string
+    """
+    import plotly.io as pio
+
+    if not isinstance(fig, dict):
+        fig = fig.to_plotly_json()
+    layout = fig.setdefault('layout', {})
+
+    template = layout.get('template')
+    if isinstance(template, str):
+        template = _template_json(template)
+    if template:
+        used_types = {trace.get('type', 'scatter') for trace in fig.get('data', [])}
+        layout['template'] = {
+            'layout': template.get('layout', {}),
+            'data': {t: v for t, v in template.get('data', {}).items() if t in used_types}
+        }
+
+    figure_json = pio.to_json(fig, validate=False, pretty=False)
+    # Keep the JSON from terminating its <script> block early
+    figure_json = figure_json.replace('</', '<\\/')
+    return HTML_TEMPLATE.format(
+        plotly_js=_plotly_js_src(), legend_html=legend_html, figure_json=figure_json
+    )
+
+
+@lru_cache(maxsize=None)
+def _template_json(name: str) -> dict:
+    """Return a registered Plotly template as a plain dict (converted once per name)."""
+    import plotly.io as pio
+
+    return pio.templates[name].to_plotly_json()
+
+
+def _typed_array(values: np.ndarray) -> dict:
+    """
+    Encode a numeric array as a plotly.js typed-array spec (dtype + base64 bytes).
+
+    Used for arrays in raw trace dicts, which skip plotly.py's own encoding.
+
+    Args:
+        values: Numeric array (float32/float64 or small integer types)
+
+    Returns:
+        Dict with 'dtype' (e.g. 'f4') and 'bdata' keys
+    """
+    values = np.ascontiguousarray(values)
+    if values.dtype.byteorder == '>':
+        values = values.astype(values.dtype.newbyteorder('<'))
+    return {
+        'dtype': values.dtype.str[1:],
+        'bdata': base64.b64encode(values.tobytes()).decode('ascii')
+    }
+
+
+@lru_cache(maxsize=1)
+def _enhanced_chart_grid() -> tuple[dict, dict]:
+    """
+    Return the enhanced chart's 2x1 subplot layout and the sunburst cell's domain.
+
+    The grid never changes, so make_subplots runs once and later charts start
+    from a copy of its axes and subplot-title annotations.
+
+    Returns:
+        Tuple of (layout dict without template, {'x': [...], 'y': [...]} domain of row 2)
+    """
+    from plotly.subplots import make_subplots
+
+    # Row 1: Efficient frontier
+    # Row 2: One sunburst with the allocations of all three portfolios
+    grid = make_subplots(
+        rows=2, cols=1,
+        subplot_titles=('Efficient Frontier with Random Portfolios', 'Portfolio Allocations'),
+        specs=[[{'type': 'xy'}], [{'type': 'domain'}]],
+        vertical_spacing=0.15
+    )
+    layout = grid.layout.to_plotly_json()
+    layout.pop('template', None)
+    domain = grid.get_subplot(2, 1)
+    return layout, {'x': list(domain.x), 'y': list(domain.y)}
+
+
+def _sort_weights(weights: Dict[str, float]) -> tuple[list, list]:
+    """
+    Sort portfolio weights in descending order.
+
+    Args:
+        weights: Dictionary of {ticker: weight}
+
+    Returns:
+        Tuple of (labels, values) lists, largest weight first
+    """
+    keys = np.array(list(weights.keys()), dtype=object)
+    vals = np.fromiter(weights.values(), dtype=np.float64, count=len(weights))
+    order = np.argsort(-vals, kind='stable')
+    return keys[order].tolist(), vals[order].tolist()
+
+
+def _slice_text(labels: list, values: list) -> list:
+    """
+    Format pie slice labels as "TICKER<br>12.3%" (share of the total).
+
+    Args:
+        labels: Slice labels
+        values: Slice values
+
+    Returns:
+        List of label strings, one per slice
+    """
+    total = sum(values) or 1.0
+    return [f"{label}<br>{value / total:.1%}" for label, value in zip(labels, values)]
+
+
+def _downsample_cloud(
+    vols: np.ndarray,
+    rets: np.ndarray,
+    sharpes: np.ndarray,
+    nbins: int = 200
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Thin an overplotted point cloud to one point per cell of an nbins x nbins grid.
+
+    The highest-Sharpe point in each cell is kept, so the cloud's outline and
+    colouring look the same while far fewer markers are drawn.
+
+    Args:
+        vols: Array of portfolio volatilities
+        rets: Array of portfolio returns
+        sharpes: Array of portfolio Sharpe ratios
+        nbins: Number of grid cells per axis
+
+    Returns:
+        Tuple of (volatilities, returns, sharpe_ratios) for the kept points
+    """
+    vol_edges = np.linspace(vols.min(), vols.max(), nbins + 1)
+    ret_edges = np.linspace(rets.min(), rets.max(), nbins + 1)
+    ix = np.clip(np.digitize(vols, vol_edges) - 1, 0, nbins - 1)
+    iy = np.clip(np.digitize(rets, ret_edges) - 1, 0, nbins - 1)
+    bin_id = ix * nbins + iy
+
+    # Order by cell, best Sharpe first, so each cell's first entry is its representative
+    order = np.lexsort((-sharpes, bin_id))
+    _, first = np.unique(bin_id[order], return_index=True)
+    keep = order[first]
+
+    return vols[keep], rets[keep], sharpes[keep]
+
+
+def _lttb(x: np.ndarray, y: np.ndarray, n_out: int = 500) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Downsample a line with Largest-Triangle-Three-Buckets.
+
+    The first and last points are kept; the points in between are split into
+    n_out - 2 buckets and from each the point forming the largest triangle with
+    the previously kept point and the next bucket's average is kept. Lines with
+    no more than n_out points are returned unchanged.
+
+    Args:
+        x: Array of x values (e.g. volatilities)
+        y: Array of y values (e.g. returns)
+        n_out: Number of points to keep
+
+    Returns:
+        Tuple of (x, y) arrays for the kept points
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    n = len(x)
+    if n <= n_out or n_out < 3:
+        return x, y
+
+    # Bucket i covers [edges[i], edges[i + 1]); the last point is its own bucket
+    edges = (np.arange(n_out - 1) * (n - 2) / (n_out - 2)).astype(int) + 1
+    edges[-1] = n - 1
+    edges = np.append(edges, n)
+
+    keep = np.empty(n_out, dtype=np.intp)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        avg_x = x[edges[i + 1]:edges[i + 2]].mean()
+        avg_y = y[edges[i + 1]:edges[i + 2]].mean()
+        area = np.abs(
+            (x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a])
+        )
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+
+    return x[keep], y[keep]
+
+
+def _quantize_colors(
+    values: np.ndarray,
+    n_bins: int = SHARPE_COLOR_BINS,
+    colorscale: str = 'Viridis_r'
+) -> tuple[np.ndarray, list, np.ndarray]:
+    """
+    Map values onto a small discrete palette instead of a continuous colorscale.
+
+    Args:
+        values: Array of values to colour (e.g. Sharpe ratios)
+        n_bins: Number of equal-width bins / colours
+        colorscale: Name of the Plotly colorscale to sample
+
+    Returns:
+        Tuple of (uint8 bin index per value, one colour per bin, n_bins + 1 bin edges)
+    """
+    from plotly.colors import sample_colorscale
+
+    lo, hi = float(values.min()), float(values.max())
+    if hi <= lo:
+        hi = lo + 1.0
+    edges = np.linspace(lo, hi, n_bins + 1)
+    codes = np.digitize(values, edges[1:-1]).astype(np.uint8)
+    colors = sample_colorscale(colorscale, np.linspace(0, 1, n_bins))
+    return codes, colors, edges
+
+
+def _discrete_colorscale(colors: list) -> list:
+    """
+    Build a stepped colorscale where bin index i (0..len(colors)-1) maps to colors[i].
+
+    Use with cmin=-0.5 and cmax=len(colors) - 0.5.
+
+    Args:
+        colors: One colour per bin
+
+    Returns:
+        Plotly colorscale as a list of [position, colour] pairs
+    """
+    n = len(colors)
+    scale = []
+    for i, color in enumerate(colors):
+        scale += [[i / n, color], [(i + 1) / n, color]]
+    return scale
+
+
+def _color_legend_html(title: str, colors: list, edges: np.ndarray) -> str:
+    """
+    Render a binned colour scale as a plain HTML strip for the chart page.
+
+    Args:
+        title: Legend title
+        colors: One colour per bin
+        edges: Bin edges (len(colors) + 1 values)
+
+    Returns:
+        HTML fragment with one swatch per bin, labelled with the outer edges
+    """
+    swatches = ''.join(
+        f'<span class="swatch" style="background:{color}" title="{lo:.2f} to {hi:.2f}"></span>'
+        for color, lo, hi in zip(colors, edges[:-1], edges[1:])
+    )
+    return (
+        f'<b>{title}</b><span class="value">{edges[0]:.2f}</span>'
+        f'{swatches}<span class="value">{edges[-1]:.2f}</span>'
+    )
 
 
 def create_efficient_frontier_chart(
@@ -26,9 +376,12 @@ def create_efficient_frontier_chart(
     Returns:
         Plotly Figure object
     """
+    import plotly.graph_objects as go
+
     fig = go.Figure()
 
-    # Add efficient frontier line
+    # Add efficient frontier line (thinned if it is very dense)
+    volatilities, returns = _lttb(volatilities, returns)
     fig.add_trace(go.Scatter(
         x=volatilities,
         y=returns,
@@ -75,16 +428,16 @@ def create_pie_chart(weights: Dict[str, float]) -> go.Figure:
     Returns:
         Plotly Figure object
     """
-    # Sort by weight descending
-    sorted_weights = dict(sorted(weights.items(), key=lambda x: x[1], reverse=True))
+    import plotly.graph_objects as go
 
-    labels = list(sorted_weights.keys())
-    values = list(sorted_weights.values())
+    # Sort by weight descending
+    labels, values = _sort_weights(weights)
 
     fig = go.Figure(data=[go.Pie(
         labels=labels,
         values=values,
-        texttemplate='%{label}<br>%{percent:.1%}',
+        text=_slice_text(labels, values),
+        textinfo='text',
         hovertemplate='%{label}<br>Weight: %{percent:.2%}<extra></extra>',
         marker=dict(line=dict(color='white', width=2))
     )])
@@ -102,11 +455,11 @@ def create_pie_chart(weights: Dict[str, float]) -> go.Figure:
 def create_enhanced_portfolio_chart(
     ef_returns: np.ndarray,
     ef_volatilities: np.ndarray,
-    max_sharpe_data: Dict,
-    min_vol_data: Dict,
-    max_utility_data: Dict,
+    opt_portfolios: np.recarray,
+    opt_weights: List[Dict[str, float]],
     random_portfolios: tuple[np.ndarray, np.ndarray, np.ndarray],
-    risk_aversion: float
+    risk_aversion: float,
+    max_points: int = 5000
 ) -> str:
     """
     Create an enhanced visualization with efficient frontier, three optimal portfolios,
@@ -115,175 +468,163 @@ def create_enhanced_portfolio_chart(
     Args:
         ef_returns: Array of efficient frontier returns
         ef_volatilities: Array of efficient frontier volatilities
-        max_sharpe_data: Dict with 'weights', 'return', 'volatility', 'sharpe'
-        min_vol_data: Dict with 'weights', 'return', 'volatility', 'sharpe'
-        max_utility_data: Dict with 'weights', 'return', 'volatility', 'sharpe'
+        opt_portfolios: Record array with fields 'ret', 'vol', 'sharpe', one
+            record each for Max Sharpe, Min Volatility and Max Utility (in that order)
+        opt_weights: Weights dicts ({ticker: weight}) in the same order, each
+            already sorted largest weight first (as Allocation.to_dict returns them)
         random_portfolios: Tuple of (returns, volatilities, sharpe_ratios) arrays
         risk_aversion: Risk aversion parameter used
+        max_points: Upper bound on random portfolios drawn; denser clouds are
+            thinned with a grid of about sqrt(max_points) cells per axis
 
     Returns:
         HTML string containing the enhanced visualization
     """
-    # Create subplots: 2 rows, 2 columns
-    # Row 1: Efficient frontier (spans 2 columns)
-    # Row 2: Three pie charts for allocations
-    fig = make_subplots(
-        rows=2, cols=3,
-        subplot_titles=(
-            'Efficient Frontier with Random Portfolios', None, None,
-            'Max Sharpe Portfolio', 'Min Volatility Portfolio', 'Max Utility Portfolio'
-        ),
-        specs=[
-            [{'type': 'scatter', 'colspan': 3}, None, None],
-            [{'type': 'pie'}, {'type': 'pie'}, {'type': 'pie'}]
-        ],
-        vertical_spacing=0.15,
-        horizontal_spacing=0.1
-    )
-
-    # Unpack random portfolios
-    rand_returns, rand_vols, rand_sharpes = random_portfolios
-
-    # Add random portfolios as background scatter (colored by Sharpe ratio)
-    fig.add_trace(
-        go.Scattergl(
-            x=rand_vols,
-            y=rand_returns,
-            mode='markers',
-            name='Random Portfolios',
-            marker=dict(
-                size=3,
-                color=rand_sharpes,
-                colorscale='Viridis_r',
-                showscale=True,
-                colorbar=dict(title='Sharpe<br>Ratio', x=1.02),
-                opacity=0.5
-            ),
-            hovertemplate='Volatility: %{x:.2%}<br>Return: %{y:.2%}<extra></extra>',
-            showlegend=True
-        ),
-        row=1, col=1
-    )
-
-    # Add efficient frontier line
-    fig.add_trace(
-        go.Scatter(
-            x=ef_volatilities,
-            y=ef_returns,
-            mode='lines',
-            name='Efficient Frontier',
-            line=dict(color='#0068ff', width=3),
-            hovertemplate='Volatility: %{x:.2%}<br>Return: %{y:.2%}<extra></extra>'
-        ),
-        row=1, col=1
-    )
-
-    # Add Max Sharpe portfolio
-    fig.add_trace(
-        go.Scatter(
-            x=[max_sharpe_data['volatility']],
-            y=[max_sharpe_data['return']],
-            mode='markers',
-            name='Max Sharpe',
-            marker=dict(color='#ff433d', size=15, symbol='star', line=dict(color='white', width=2)),
-            hovertemplate=f"Max Sharpe<br>Return: {max_sharpe_data['return']:.2%}<br>Volatility: {max_sharpe_data['volatility']:.2%}<br>Sharpe: {max_sharpe_data['sharpe']:.2f}<extra></extra>"
-        ),
-        row=1, col=1
+    # Traces and layout are plain dicts: plotly.py's property validation is
+    # skipped and the page receives exactly what is written here
+    grid_layout, allocation_domain = _enhanced_chart_grid()
+    layout = copy.deepcopy(grid_layout)
+
+    # Unpack random portfolios. float32 is plenty for plotting and halves the
+    # serialized payload the webview has to parse.
+    rand_returns, rand_vols, rand_sharpes = (
+        np.asarray(a, dtype=np.float32) for a in random_portfolios
     )
-
-    # Add Min Volatility portfolio
-    fig.add_trace(
-        go.Scatter(
-            x=[min_vol_data['volatility']],
-            y=[min_vol_data['return']],
-            mode='markers',
-            name='Min Volatility',
-            marker=dict(color='#4af6c3', size=15, symbol='star', line=dict(color='white', width=2)),
-            hovertemplate=f"Min Volatility<br>Return: {min_vol_data['return']:.2%}<br>Volatility: {min_vol_data['volatility']:.2%}<br>Sharpe: {min_vol_data['sharpe']:.2f}<extra></extra>"
-        ),
-        row=1, col=1
-    )
-
-    # Add Max Utility portfolio
-    fig.add_trace(
-        go.Scatter(
-            x=[max_utility_data['volatility']],
-            y=[max_utility_data['return']],
-            mode='markers',
-            name='Max Utility',
-            marker=dict(color='#fb8b1e', size=15, symbol='star', line=dict(color='white', width=2)),
-            hovertemplate=f"Max Utility<br>Return: {max_utility_data['return']:.2%}<br>Volatility: {max_utility_data['volatility']:.2%}<br>Sharpe: {max_utility_data['sharpe']:.2f}<extra></extra>"
+    if len(rand_vols) > max_points:
+        rand_vols, rand_returns, rand_sharpes = _downsample_cloud(
+            rand_vols, rand_returns, rand_sharpes, nbins=int(np.sqrt(max_points))
+        )
+
+    # Colour by Sharpe bin rather than the raw value, so the WebGL renderer
+    # only deals with a small palette. The scale is shown as a static HTML
+    # legend above the chart instead of a Plotly colorbar.
+    sharpe_codes, sharpe_colors, sharpe_edges = _quantize_colors(rand_sharpes)
+
+    # Random portfolios as background scatter (colored by Sharpe ratio)
+    random_trace = dict(
+        type='scattergl',
+        xaxis='x', yaxis='y',
+        x=_typed_array(rand_vols),
+        y=_typed_array(rand_returns),
+        mode='markers',
+        name='Random Portfolios',
+        marker=dict(
+            size=3,
+            color=_typed_array(sharpe_codes),
+            colorscale=_discrete_colorscale(sharpe_colors),
+            cmin=-0.5,
+            cmax=SHARPE_COLOR_BINS - 0.5,
+            showscale=False,
+            opacity=0.5
         ),
-        row=1, col=1
+        hovertemplate='Volatility: %{x:.2%}<br>Return: %{y:.2%}<extra></extra>',
+        showlegend=True
     )
 
-    # Add pie charts for each portfolio
-    # Max Sharpe
-    sorted_max_sharpe = dict(sorted(max_sharpe_data['weights'].items(), key=lambda x: x[1], reverse=True))
-    fig.add_trace(
-        go.Pie(
-            labels=list(sorted_max_sharpe.keys()),
-            values=list(sorted_max_sharpe.values()),
-            texttemplate='%{label}<br>%{percent:.1%}',
-            hovertemplate='%{label}<br>Weight: %{percent:.2%}<extra></extra>',
-            marker=dict(line=dict(color='white', width=2)),
-            showlegend=False
-        ),
-        row=2, col=1
+    # Efficient frontier line (thinned if it is very dense)
+    ef_volatilities, ef_returns = _lttb(ef_volatilities, ef_returns)
+    frontier_trace = dict(
+        type='scatter',
+        xaxis='x', yaxis='y',
+        x=_typed_array(np.asarray(ef_volatilities, dtype=np.float64)),
+        y=_typed_array(np.asarray(ef_returns, dtype=np.float64)),
+        mode='lines',
+        name='Efficient Frontier',
+        line=dict(color='#0068ff', width=3),
+        hovertemplate='Volatility: %{x:.2%}<br>Return: %{y:.2%}<extra></extra>'
     )
 
-    # Min Volatility
-    sorted_min_vol = dict(sorted(min_vol_data['weights'].items(), key=lambda x: x[1], reverse=True))
-    fig.add_trace(
-        go.Pie(
-            labels=list(sorted_min_vol.keys()),
-            values=list(sorted_min_vol.values()),
-            texttemplate='%{label}<br>%{percent:.1%}',
-            hovertemplate='%{label}<br>Weight: %{percent:.2%}<extra></extra>',
-            marker=dict(line=dict(color='white', width=2)),
-            showlegend=False
+    # The three optimal portfolios as one star trace, labelled on the chart
+    optimal_names = np.array(OPTIMAL_PORTFOLIO_NAMES)
+    # Hover text is formatted up front so the page only substitutes one string per point
+    optimal_hover = optimal_names
+    for fmt, column in (
+        ('<br>Return: %.2f%%', opt_portfolios.ret * 100),
+        ('<br>Volatility: %.2f%%', opt_portfolios.vol * 100),
+        ('<br>Sharpe: %.2f', opt_portfolios.sharpe)
+    ):
+        optimal_hover = np.char.add(optimal_hover, np.char.mod(fmt, column))
+
+    optimal_trace = dict(
+        type='scatter',
+        xaxis='x', yaxis='y',
+        x=opt_portfolios.vol.tolist(),
+        y=opt_portfolios.ret.tolist(),
+        mode='markers+text',
+        name='Optimal Portfolios',
+        text=optimal_names.tolist(),
+        textposition='top center',
+        hovertext=optimal_hover.tolist(),
+        marker=dict(
+            color=list(OPTIMAL_PORTFOLIO_COLORS),
+            size=15,
+            symbol='star',
+            line=dict(color='white', width=2)
         ),
-        row=2, col=2
+        hovertemplate='%{hovertext}<extra></extra>'
     )
 
-    # Max Utility
-    sorted_max_utility = dict(sorted(max_utility_data['weights'].items(), key=lambda x: x[1], reverse=True))
-    fig.add_trace(
-        go.Pie(
-            labels=list(sorted_max_utility.keys()),
-            values=list(sorted_max_utility.values()),
-            texttemplate='%{label}<br>%{percent:.1%}',
-            hovertemplate='%{label}<br>Weight: %{percent:.2%}<extra></extra>',
-            marker=dict(line=dict(color='white', width=2)),
-            showlegend=False
-        ),
-        row=2, col=3
+    # The allocations as one sunburst: an inner ring per portfolio and
+    # its holdings (already largest first) around it
+    ids, labels, parents, values, text, colors = [], [], [], [], [], []
+    for name, portfolio_weights, color in zip(
+        OPTIMAL_PORTFOLIO_NAMES, opt_weights, OPTIMAL_PORTFOLIO_COLORS
+    ):
+        tickers, weights = list(portfolio_weights), list(portfolio_weights.values())
+        ids += [name] + [f"{name}/{t}" for t in tickers]
+        labels += [name] + tickers
+        parents += [''] + [name] * len(tickers)
+        # Parent value is the exact sum of its children, as branchvalues='total' requires
+        values += [sum(weights)] + weights
+        text += [name] + _slice_text(tickers, weights)
+        colors += [color] * (len(tickers) + 1)
+
+    allocation_trace = dict(
+        type='sunburst',
+        domain=allocation_domain,
+        ids=ids,
+        labels=labels,
+        parents=parents,
+        values=values,
+        branchvalues='total',
+        text=text,
+        textinfo='text',
+        hovertemplate='%{label}<br>Weight: %{value:.2%}<extra></extra>',
+        marker=dict(colors=colors, line=dict(color='white', width=2))
     )
 
     # Update layout
-    fig.update_xaxes(title_text='Volatility (Risk)', tickformat='.1%', row=1, col=1)
-    fig.update_yaxes(title_text='Expected Return', tickformat='.1%', row=1, col=1)
+    layout['xaxis'].update(title=dict(text='Volatility (Risk)'), tickformat='.1%')
+    layout['yaxis'].update(title=dict(text='Expected Return'), tickformat='.1%')
 
     # Create title with performance metrics
+    max_sharpe, min_vol, max_utility = opt_portfolios
     title_html = f"""
     <b>Portfolio Optimization Results</b><br>
     <sub>
-    Max Sharpe: Return={max_sharpe_data['return']:.2%}, Vol={max_sharpe_data['volatility']:.2%}, Sharpe={max_sharpe_data['sharpe']:.2f} |
-    Min Vol: Return={min_vol_data['return']:.2%}, Vol={min_vol_data['volatility']:.2%}, Sharpe={min_vol_data['sharpe']:.2f} |
-    Max Utility: Return={max_utility_data['return']:.2%}, Vol={max_utility_data['volatility']:.2%}, Sharpe={max_utility_data['sharpe']:.2f} (λ={risk_aversion})
+    Max Sharpe: Return={max_sharpe.ret:.2%}, Vol={max_sharpe.vol:.2%}, Sharpe={max_sharpe.sharpe:.2f} |
+    Min Vol: Return={min_vol.ret:.2%}, Vol={min_vol.vol:.2%}, Sharpe={min_vol.sharpe:.2f} |
+    Max Utility: Return={max_utility.ret:.2%}, Vol={max_utility.vol:.2%}, Sharpe={max_utility.sharpe:.2f} (λ={risk_aversion})
     </sub>
     """
 
-    fig.update_layout(
-        title_text=title_html,
+    layout.update(
+        title=dict(text=title_html),
         showlegend=True,
         template='plotly_white',
         height=1000,
-        width=1600
+        width=1600,
+        # Keep user zoom/pan when the window is updated with a new result
+        uirevision='portfolio',
+        datarevision=0
     )
 
     # Convert to HTML
-    html = fig.to_html(include_plotlyjs='cdn')
+    figure = {
+        'data': [random_trace, frontier_trace, optimal_trace, allocation_trace],
+        'layout': layout
+    }
+    html = _figure_to_html(figure, _color_legend_html('Sharpe Ratio', sharpe_colors, sharpe_edges))
     return html
 
 
@@ -309,6 +650,9 @@ def create_combined_chart(
     Returns:
         HTML string containing the combined visualization
     """
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
     # Create subplots: 1 row, 2 columns
     fig = make_subplots(
         rows=1, cols=2,
@@ -344,15 +688,14 @@ def create_combined_chart(
     )
 
     # Add pie chart to subplot 2
-    sorted_weights = dict(sorted(weights.items(), key=lambda x: x[1], reverse=True))
-    labels = list(sorted_weights.keys())
-    values = list(sorted_weights.values())
+    labels, values = _sort_weights(weights)
 
     fig.add_trace(
         go.Pie(
             labels=labels,
             values=values,
-            texttemplate='%{label}<br>%{percent:.1%}',
+            text=_slice_text(labels, values),
+            textinfo='text',
             hovertemplate='%{label}<br>Weight: %{percent:.2%}<extra></extra>',
             marker=dict(line=dict(color='white', width=2))
         ),
@@ -374,11 +717,40 @@ def create_combined_chart(
     )
 
     # Convert to HTML
-    html = fig.to_html(include_plotlyjs='cdn')
+    html = _figure_to_html(fig)
     return html
 
 
-def display_charts(html_content: str, title: str = "Portfolio Optimization Results") -> None:
+def _relay_output(process: subprocess.Popen, html_paths: List[str]) -> None:
+    """Wait for the webview process to exit, print whatever it wrote and remove its HTML files."""
+    # Not communicate(): that would close stdin, which carries later chart updates
+    stderr_out = []
+    stderr_reader = threading.Thread(
+        target=lambda: stderr_out.append(process.stderr.read()), daemon=True
+    )
+    stderr_reader.start()
+    try:
+        stdout = process.stdout.read()
+        stderr_reader.join()
+        process.wait()
+    finally:
+        with _viewer_lock:
+            for path in html_paths:
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+            html_paths.clear()
+
+    # Print any output from the webview process
+    stderr = stderr_out[0] if stderr_out else ''
+    if stdout:
+        print(f"[WebView] {stdout.strip()}")
+    if stderr:
+        print(f"[WebView] {stderr.strip()}", file=sys.stderr)
+
+
+def display_charts(html_content: str, title: str = "Portfolio Optimization Results") -> subprocess.Popen:
     """
     Display charts in a PyWebView window using a separate process.
 
@@ -386,31 +758,58 @@ def display_charts(html_content: str, title: str = "Portfolio Optimization Resul
     Textual TUI event loop. PyWebView requires the main thread, so we
     run it in its own process where it CAN be the main thread.
 
+    If a window from an earlier call is still open, the new chart is sent to
+    it and redrawn in place instead of starting another process.
+
+    Returns as soon as the process is launched (or updated); the window stays
+    open until the user closes it.
+
     Args:
         html_content: HTML string containing the visualization
         title: Window title
-    """
-    # Get path to webview_process.py
-    webview_script = Path(__file__).parent / "webview_process.py"
 
-    # Encode HTML as base64 to safely pass as command-line argument
-    html_b64 = base64.b64encode(html_content.encode('utf-8')).decode('ascii')
-
-    # Run webview in separate process
-    # Use sys.executable to ensure same Python interpreter
-    process = subprocess.Popen(
-        [sys.executable, str(webview_script), html_b64, title],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True
-    )
-
-    # Wait for process to complete (window to close)
-    # This blocks, but it's in a separate process so Textual can still respond
-    stdout, stderr = process.communicate()
-
-    # Print any output from the webview process
-    if stdout:
-        print(f"[WebView] {stdout.strip()}")
-    if stderr:
-        print(f"[WebView] {stderr.strip()}", file=sys.stderr)
+    Returns:
+        The webview process (call .wait() or .poll() to track the window closing)
+    """
+    global _viewer, _viewer_files
+
+    # Hand the HTML over as a file path: argv length is capped by the OS and
+    # streaming the page itself through stdin deadlocks on macOS. The webview
+    # loads it as a file:// URL.
+    with tempfile.NamedTemporaryFile(
+        'w', encoding='utf-8', prefix='tpo-', suffix='.html', delete=False
+    ) as f:
+        f.write(html_content)
+        html_path = f.name
+
+    with _viewer_lock:
+        # Reuse the open window: send the file path as one JSON line on its stdin
+        if _viewer is not None and _viewer.poll() is None:
+            try:
+                _viewer.stdin.write(json.dumps({'path': html_path, 'title': title}) + '\n')
+                _viewer.stdin.flush()
+                _viewer_files.append(html_path)
+                return _viewer
+            except (BrokenPipeError, OSError):
+                pass  # Window went away in the meantime; start a new one
+
+        # Get path to webview_process.py
+        webview_script = Path(__file__).parent / "webview_process.py"
+
+        # Run webview in separate process
+        # Use sys.executable to ensure same Python interpreter
+        _viewer = subprocess.Popen(
+            [sys.executable, str(webview_script), html_path, title],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True
+        )
+        _viewer_files = [html_path]
+        process = _viewer
+
+        # Drain the process output in the background so the caller never blocks on it;
+        # the temp files are removed once the window closes
+        threading.Thread(target=_relay_output, args=(process, _viewer_files), daemon=True).start()
+
+    return process
@@ -6,19 +6,29 @@ so we run it in its own process where it CAN be the main thread.
 """
 
 import sys
+import json
+import threading
+from pathlib import Path
+from typing import Optional
 import webview
 
 
-def run_webview(html_content: str, title: str = "Portfolio Optimization Results") -> None:
+def run_webview(
+    html_content: Optional[str] = None,
+    title: str = "Portfolio Optimization Results",
+    url: Optional[str] = None
+) -> None:
     """
     Run PyWebView window in this process's main thread.
 
     Args:
         html_content: HTML string containing the visualization
         title: Window title
+        url: URL to load instead of html_content (e.g. a file:// URL)
     """
     window = webview.create_window(
         title=title,
+        url=url,
         html=html_content,
         width=1400,
         height=900,
@@ -29,22 +39,41 @@ def run_webview(html_content: str, title: str = "Portfolio Optimization Results"
 
     def on_loaded():
         """Confirm successful load."""
-        print(f"[WebView Process] Visualization loaded")
+        print("[WebView Process] Visualization loaded")
 
     def on_closing():
         """Handle window closing."""
-        print(f"[WebView Process] Closing visualization...")
+        print("[WebView Process] Closing visualization...")
         return True
 
     def on_closed():
         """Cleanup after close."""
-        print(f"[WebView Process] Visualization closed")
+        print("[WebView Process] Visualization closed")
+
+    def follow_updates():
+        """Redraw the chart in place for each file path the parent sends on stdin."""
+        for line in sys.stdin:
+            try:
+                message = json.loads(line)
+                html = Path(message['path']).read_text(encoding='utf-8')
+            except (ValueError, KeyError, OSError) as e:
+                print(f"[WebView Process] Ignoring update: {e}", file=sys.stderr)
+                continue
+            window.set_title(message.get('title', title))
+            window.evaluate_js(f"update({json.dumps(html)})")
+            print("[WebView Process] Visualization updated")
 
     # Subscribe to events
     window.events.loaded += on_loaded
     window.events.closing += on_closing
     window.events.closed += on_closed
 
+    # When loading a file, stdin is the parent's update channel. The reader is a
+    # daemon thread so it can't keep the process alive once the window closes
+    # (the parent never closes stdin while the window is open).
+    if url is not None:
+        threading.Thread(target=follow_updates, daemon=True).start()
+
     # Start GUI loop (blocks until window closes)
     # This is fine because this entire PROCESS is dedicated to the webview
     webview.start()
@@ -52,15 +81,16 @@ def run_webview(html_content: str, title: str = "Portfolio Optimization Results"
 
 if __name__ == "__main__":
     # This script is meant to be run as a separate process
-    # Expects HTML content via stdin or as base64 encoded argument
+    # Expects the path of an HTML file as argument, or HTML content via stdin.
+    # With a path, stdin carries newline-delimited JSON updates:
+    # {"path": "<html file>", "title": "<window title>"}
 
     if len(sys.argv) > 1:
-        # HTML content passed as argument (base64 encoded)
-        import base64
-        html_b64 = sys.argv[1]
+        # Path to the HTML file written by the parent; load it directly as a
+        # file:// URL so the browser engine reads it (and plotly.js) from disk
+        html_path = Path(sys.argv[1]).resolve()
         title = sys.argv[2] if len(sys.argv) > 2 else "Portfolio Optimization Results"
-        html_content = base64.b64decode(html_b64).decode('utf-8')
-        run_webview(html_content, title)
+        run_webview(title=title, url=html_path.as_uri())
     else:
         # Read HTML from stdin
         print("[WebView Process] Reading HTML from stdin...", file=sys.stderr)
@@ -0,0 +1,51 @@
+"""Tests for the on-disk price cache in src.data_fetcher."""
+
+import os
+from datetime import date, datetime, time, timedelta
+
+import pandas as pd
+
+from src.data_fetcher import _read_cache, _write_cache
+
+
+def _write_at(path, series: pd.Series, when: datetime) -> None:
+    """Write a cache entry and backdate its mtime to `when`."""
+    _write_cache(path, series)
+    ts = when.timestamp()
+    os.utime(path, (ts, ts))
+
+
+def test_entry_cached_while_open_expires_after_close(tmp_path):
+    """A window fetched on its last day may be partial and must be refetched later."""
+    end = date.today() - timedelta(days=10)
+    path = tmp_path / "open.pkl"
+    _write_at(path, pd.Series([1.0, 2.0]), datetime.combine(end, time(10, 0)))
+
+    assert _read_cache(path, end.isoformat()) is None
+
+
+def test_entry_cached_after_close_never_expires(tmp_path):
+    """A window fetched after it closed is complete and is reused indefinitely."""
+    end = date.today() - timedelta(days=10)
+    series = pd.Series([1.0, 2.0])
+    path = tmp_path / "closed.pkl"
+    _write_at(path, series, datetime.combine(end + timedelta(days=1), time(10, 0)))
+
+    cached = _read_cache(path, end.isoformat())
+    assert cached is not None
+    assert cached.equals(series)
+
+
+def test_open_window_is_reused_within_ttl(tmp_path):
+    """A window that is still open is served from cache until the TTL runs out."""
+    series = pd.Series([1.0, 2.0])
+    path = tmp_path / "today.pkl"
+    _write_cache(path, series)
+
+    cached = _read_cache(path, date.today().isoformat())
+    assert cached is not None
+    assert cached.equals(series)
+
+
+def test_missing_entry_returns_none(tmp_path):
+    assert _read_cache(tmp_path / "missing.pkl", date.today().isoformat()) is None